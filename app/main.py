@@ -2,7 +2,8 @@
 main.py — Entrypoint for sonny1.0
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException
 from fastapi.responses import StreamingResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
@@ -13,6 +14,21 @@ from app.actions.action_parser import extract_actions
 from app.actions.action_router import execute_action
 from app.memory.memory_log import log_memory
 from app.memory.memory_manager import store_memory, normalize_memory, should_store_memory, hybrid_memory_search
+from app.memory.embedding_queue import start_worker, pending_count
+from app.memory.chroma_client import get_active_index, get_chroma_client
+from app.memory.reindex import start_reindex, reindex_status
+
+
+# ---------------------------------------------------------
+# Lifespan: Chroma client and background embedding queue worker
+# ---------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open Chroma now so a worker that can't own the store fails at boot
+    get_chroma_client()
+    queue_stop = start_worker()
+    yield
+    queue_stop.set()
 
 
 # ---------------------------------------------------------
@@ -21,7 +37,8 @@ from app.memory.memory_manager import store_memory, normalize_memory, should_sto
 app = FastAPI(
     title="sonny1.0 API",
     description="Backend API for your personal AI assistant.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 
@@ -29,8 +46,12 @@ app = FastAPI(
 # Health check
 # ---------------------------------------------------------
 @app.get("/health")
-async def health():
-    return {"status": "ok"}
+def health():
+    return {
+        "status": "ok",
+        "pending_embeddings": pending_count(),
+        "memory_index": get_active_index(),
+    }
 
 
 # ---------------------------------------------------------
@@ -40,6 +61,26 @@ class PromptRequest(BaseModel):
     prompt: str
 
 
+class ReindexRequest(BaseModel):
+    model: str
+
+
+# ---------------------------------------------------------
+# Embedding model migration
+# ---------------------------------------------------------
+@app.post("/memory/reindex")
+def reindex_memory(request: ReindexRequest):
+    try:
+        return start_reindex(request.model)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.get("/memory/reindex")
+def reindex_progress():
+    return reindex_status() or {"status": "idle"}
+
+
 # ---------------------------------------------------------
 # Ollama streaming helper
 # ---------------------------------------------------------
@@ -1,31 +1,141 @@
 """
 chroma_client.py — Handles connection to ChromaDB
 
-This module initializes a persistent ChromaDB client and exposes
+This module initializes a ChromaDB client and exposes
 a function to retrieve the memory collection used by sonny.
 
 ChromaDB stores vector embeddings and metadata, allowing sonny
 to remember past interactions, facts, and context.
+
+Two modes are supported:
+    - Embedded (default): a PersistentClient opened on CHROMA_PATH.
+      Only safe with a single uvicorn worker.
+    - Service: set SONNY_CHROMA_HOST (and optionally SONNY_CHROMA_PORT)
+      to talk to one `chroma run` process that owns CHROMA_PATH.
+      Every API worker shares that process, so
+      `uvicorn app.main:app --workers N` sees a single, consistent index.
+
+Collections are versioned by embedding model and dimension. A small
+registry file records which one is active; reindex.py builds a new
+collection in the background and then swaps the pointer.
 """
 import chromadb
+import json
 import os
+import re
+import threading
+
+from filelock import FileLock, Timeout
+
+from app.memory.embeddings import DEFAULT_MODEL
 
 CHROMA_PATH = "/home/sonny/sonny-system/data/chroma"
+CHROMA_HOST = os.environ.get("SONNY_CHROMA_HOST")
+CHROMA_PORT = int(os.environ.get("SONNY_CHROMA_PORT", "8001"))
+
+REGISTRY_PATH = "/home/sonny/sonny-system/data/memory_index.json"
+
+# The collection that existed before versioning; built with nomic-embed-text
+LEGACY_INDEX = {"name": "sonny_memory", "model": DEFAULT_MODEL, "dim": 768}
+
+# One client per process; the HTTP client keeps its connection pool alive
+_client = None
+_client_lock = threading.Lock()
+
+# Held for the life of the process while the embedded client is open
+_owner_lock = None
+
 
 def get_chroma_client():
-    os.makedirs(CHROMA_PATH, exist_ok=True)
-    client = chromadb.PersistentClient(path=CHROMA_PATH)
-    return client
+    global _client
+
+    if _client is not None:
+        return _client
+
+    # Threads in this process (requests, queue worker) must share one client;
+    # a second owner lock from the same process would look like another process
+    with _client_lock:
+        if _client is None:
+            if CHROMA_HOST:
+                _client = chromadb.HttpClient(host=CHROMA_HOST, port=CHROMA_PORT)
+            else:
+                os.makedirs(CHROMA_PATH, exist_ok=True)
+                _claim_embedded_store()
+                _client = chromadb.PersistentClient(path=CHROMA_PATH)
+
+    return _client
+
+
+def _claim_embedded_store():
+    """
+    Refuse to open CHROMA_PATH if another process already has it open,
+    e.g. a second uvicorn worker or the re-index CLI next to the server.
+    """
+    global _owner_lock
+
+    lock = FileLock(os.path.join(CHROMA_PATH, "sonny-owner.lock"))
+    try:
+        lock.acquire(timeout=0)
+    except Timeout:
+        raise RuntimeError(
+            f"{CHROMA_PATH} is already open in another process. The embedded "
+            "ChromaDB client only supports one process; set SONNY_CHROMA_HOST "
+            "to use a shared Chroma service (see scripts/start.sh)."
+        )
+    _owner_lock = lock
+
+
+# ---------------------------------------------------------
+# Index registry (which collection is live)
+# ---------------------------------------------------------
+
+def registry_lock():
+    return FileLock(REGISTRY_PATH + ".lock")
+
+
+def load_registry() -> dict:
+    try:
+        with open(REGISTRY_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"active": dict(LEGACY_INDEX)}
+
+
+def save_registry(registry: dict):
+    """Write the registry atomically. Call with registry_lock() held."""
+    os.makedirs(os.path.dirname(REGISTRY_PATH), exist_ok=True)
+    tmp = f"{REGISTRY_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(registry, f, indent=2)
+    os.replace(tmp, REGISTRY_PATH)
+
+
+def get_active_index() -> dict:
+    """The live index: {"name", "model", "dim"}."""
+    return load_registry()["active"]
+
+
+def collection_name(model: str, dim: int) -> str:
+    slug = re.sub(r"[^a-zA-Z0-9]+", "-", model).strip("-")
+    return f"sonny_memory_{slug}_{dim}"
 
 
 # ---------------------------------------------------------
 # Get or create the memory collection
 # ---------------------------------------------------------
 
-def get_memory_collection():
+def get_collection(index: dict):
     client = get_chroma_client()
     collection = client.get_or_create_collection(
-        name="sonny_memory",
-        metadata={"hnsw:space": "cosine"}
+        name=index["name"],
+        metadata={
+            "hnsw:space": "cosine",
+            "embedding_model": index["model"],
+            "embedding_dim": index["dim"],
+        }
     )
     return collection
+
+
+def get_memory_collection():
+    return get_collection(get_active_index())
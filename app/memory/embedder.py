@@ -1,15 +1,44 @@
+import time
+
+from app.memory.chroma_client import get_active_index
 from app.memory.embeddings import generate_embedding
 
-# Cache the fallback dimension after first successful embed
-FALLBACK_DIM = 768
+# After a failure, skip Ollama for this long so /ask doesn't wait on timeouts
+COOLDOWN = 30
+
+# model -> time until which it's treated as down (per process)
+_down_until = {}
+
+
+def embedder_down(model: str) -> bool:
+    return _down_until.get(model, 0) > time.time()
+
+
+def embed_text(text: str, model: str = None, force: bool = False) -> list:
+    """
+    Returns the embedding for text, or an empty list if Ollama failed.
+
+    The model defaults to the one that built the live collection, so
+    queries and writes stay compatible with the vectors already stored.
+
+    Once a call fails, further calls return [] straight away for COOLDOWN
+    seconds. Background jobs with their own backoff pass force=True to
+    try anyway; a success closes the breaker again.
 
-def embed_text(text: str) -> list:
-    global FALLBACK_DIM
+    Callers must not substitute a placeholder vector; a zero vector in the
+    cosine index degrades recall for every later query. Memories that can't
+    be embedded go to the pending queue (see embedding_queue.py).
+    """
+    if model is None:
+        model = get_active_index()["model"]
 
-    embedding = generate_embedding(text)
+    if not force and embedder_down(model):
+        return []
 
-    if embedding:
-        FALLBACK_DIM = len(embedding)
-        return embedding
+    embedding = generate_embedding(text, model)
+    if not embedding:
+        _down_until[model] = time.time() + COOLDOWN
+        return []
 
-    return [0.0] * FALLBACK_DIM
\ No newline at end of file
+    _down_until.pop(model, None)
+    return embedding
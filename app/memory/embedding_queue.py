@@ -0,0 +1,278 @@
+"""
+embedding_queue.py — Durable queue of memories waiting for an embedding
+
+When Ollama can't produce an embedding, the memory is parked here as
+plain text instead of being written to ChromaDB with a zero vector.
+A background worker retries the queue with exponential backoff and
+moves each memory into the collection once it has a real vector.
+
+The queue is a JSON file guarded by a file lock, so every uvicorn
+worker can add to it and drain it safely. On first startup the worker
+also pulls any zero vectors left by older versions back into the queue.
+"""
+
+import json
+import os
+import threading
+import time
+
+from filelock import FileLock
+
+from app.memory.chroma_client import (
+    get_active_index,
+    get_collection,
+    load_registry,
+    registry_lock,
+    save_registry,
+)
+from app.memory.embedder import embed_text
+
+QUEUE_PATH = "/home/sonny/sonny-system/data/pending_embeddings.json"
+
+BASE_BACKOFF = 5        # seconds before the first retry
+MAX_BACKOFF = 600       # never wait longer than this between retries
+POLL_INTERVAL = 5       # how often the worker checks for due entries
+LEASE = 300             # how long a claimed entry is hidden from other workers
+BATCH_SIZE = 16
+
+
+# ---------------------------------------------------------
+# Queue file helpers
+# ---------------------------------------------------------
+
+def _lock():
+    return FileLock(QUEUE_PATH + ".lock")
+
+
+def _load() -> list:
+    try:
+        with open(QUEUE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+def _save(entries: list):
+    os.makedirs(os.path.dirname(QUEUE_PATH), exist_ok=True)
+    tmp = f"{QUEUE_PATH}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, QUEUE_PATH)
+
+
+# ---------------------------------------------------------
+# Public interface
+# ---------------------------------------------------------
+
+def _entry(memory_id: str, text: str, metadata: dict, next_attempt: float) -> dict:
+    return {
+        "id": memory_id,
+        "text": text,
+        "metadata": metadata,
+        "attempts": 0,
+        "next_attempt": next_attempt,
+    }
+
+
+def enqueue(memory_id: str, text: str, metadata: dict):
+    """Park a memory until its embedding can be generated."""
+    entry = _entry(memory_id, text, metadata, time.time() + BASE_BACKOFF)
+    with _lock():
+        entries = _load()
+        entries.append(entry)
+        _save(entries)
+
+
+def index_memories(index: dict, ids: list, documents: list, embeddings: list, metadatas: list) -> bool:
+    """
+    Write memories into index, then follow any re-index swap that
+    happened while they were being embedded.
+
+    A writer that read the old index before the swap may land after the
+    re-index job's last catch-up pass; re-checking here means the memory
+    still reaches the live collection.
+
+    Returns:
+        bool: False if the new model couldn't embed them after a swap.
+            They are then missing from the live index and the caller
+            must queue them (or keep them queued).
+    """
+    while True:
+        get_collection(index).upsert(
+            ids=ids,
+            documents=documents,
+            embeddings=embeddings,
+            metadatas=metadatas,
+        )
+
+        active = get_active_index()
+        if active["name"] == index["name"]:
+            return True
+
+        index = active
+        embeddings = [embed_text(d, index["model"]) for d in documents]
+        if not all(embeddings):
+            return False
+
+
+def requeue_zero_vectors(page_size: int = 256) -> int:
+    """
+    Move memories stored with an all-zero embedding into the queue.
+
+    Older versions wrote [0.0] * 768 whenever Ollama failed, which poisons
+    the cosine index. Runs once per collection: the first worker to get
+    the lock scans and records it in the registry, the rest skip.
+
+    Returns:
+        int: How many memories were requeued.
+    """
+    index = get_active_index()
+
+    with FileLock(QUEUE_PATH + ".zero.lock"):
+        if index["name"] in load_registry().get("zero_vectors_cleared", []):
+            return 0
+
+        collection = get_collection(index)
+
+        # Nothing else deletes while we hold the lock, so offsets stay stable
+        zero = {}
+        offset = 0
+        while True:
+            rows = collection.get(
+                include=["documents", "metadatas", "embeddings"],
+                limit=page_size,
+                offset=offset,
+            )
+            if not rows["ids"]:
+                break
+            for memory_id, text, metadata, embedding in zip(
+                rows["ids"], rows["documents"], rows["metadatas"], rows["embeddings"]
+            ):
+                if not any(embedding):
+                    zero[memory_id] = (text, metadata or {"source": "sonny"})
+            offset += len(rows["ids"])
+
+        if zero:
+            # Queue first, then delete, so a crash in between loses nothing
+            now = time.time()
+            with _lock():
+                entries = _load()
+                queued = {e["id"] for e in entries}
+                for memory_id, (text, metadata) in zero.items():
+                    if memory_id not in queued:
+                        entries.append(_entry(memory_id, text, metadata, now))
+                _save(entries)
+
+            collection.delete(ids=list(zero))
+
+        with registry_lock():
+            registry = load_registry()
+            registry.setdefault("zero_vectors_cleared", []).append(index["name"])
+            save_registry(registry)
+
+    return len(zero)
+
+
+def pending_count() -> int:
+    """Number of memories still waiting for an embedding."""
+    return len(_load())
+
+
+def pending_documents() -> list:
+    """Texts of queued memories, so keyword search can still find them."""
+    return [e["text"] for e in _load()]
+
+
+def process_pending(batch_size: int = BATCH_SIZE) -> int:
+    """
+    Try to embed every due entry and move it into ChromaDB.
+
+    Returns:
+        int: How many memories were indexed.
+    """
+    # Claim the batch before releasing the lock so other workers skip it;
+    # if this process dies, the lease runs out and someone else retries
+    now = time.time()
+    with _lock():
+        entries = _load()
+        due = [e for e in entries if e["next_attempt"] <= now][:batch_size]
+        for entry in due:
+            entry["next_attempt"] = now + LEASE
+        if due:
+            _save(entries)
+
+    if not due:
+        return 0
+
+    # Pin the index so the embedding model matches the collection written to
+    index = get_active_index()
+
+    done, failed = {}, {}
+    for entry in due:
+        # The queue has its own backoff, so it probes even while the breaker is open
+        embedding = embed_text(entry["text"], index["model"], force=True)
+        if embedding:
+            done[entry["id"]] = (entry, embedding)
+        else:
+            failed[entry["id"]] = entry
+            # Ollama is still down, don't hammer it for the rest of the batch
+            break
+
+    # upsert keeps this idempotent if two workers embed the same entry
+    if done and not index_memories(
+        index,
+        ids=list(done),
+        documents=[e["text"] for e, _ in done.values()],
+        embeddings=[v for _, v in done.values()],
+        metadatas=[e["metadata"] for e, _ in done.values()],
+    ):
+        # A swap left them only in the old collection; keep them queued
+        done = {}
+
+    # Release the lease on anything claimed but not indexed
+    claimed = {e["id"] for e in due}
+    with _lock():
+        remaining = []
+        for entry in _load():
+            if entry["id"] in done:
+                continue
+            if entry["id"] in failed:
+                entry["attempts"] += 1
+                delay = min(BASE_BACKOFF * 2 ** entry["attempts"], MAX_BACKOFF)
+                entry["next_attempt"] = time.time() + delay
+            elif entry["id"] in claimed:
+                entry["next_attempt"] = time.time() + BASE_BACKOFF
+            remaining.append(entry)
+        _save(remaining)
+
+    return len(done)
+
+
+# ---------------------------------------------------------
+# Background worker
+# ---------------------------------------------------------
+
+def _worker_loop(stop: threading.Event):
+    try:
+        requeued = requeue_zero_vectors()
+        if requeued:
+            print(f"[Embedding Queue] Requeued {requeued} zero-vector memories")
+    except Exception as e:
+        print(f"[Embedding Queue Error] {e}")
+
+    while not stop.is_set():
+        try:
+            process_pending()
+        except Exception as e:
+            print(f"[Embedding Queue Error] {e}")
+        stop.wait(POLL_INTERVAL)
+
+
+def start_worker() -> threading.Event:
+    """Start the re-embedding thread. Set the returned event to stop it."""
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=_worker_loop, args=(stop,), name="embedding-queue", daemon=True
+    )
+    thread.start()
+    return stop
@@ -8,33 +8,38 @@ store and retrieve memories based on similarity.
 
 import requests
 
+DEFAULT_MODEL = "nomic-embed-text"
+
 # ---------------------------------------------------------
 # Generate embeddings using Ollama
 # ---------------------------------------------------------
 
-def generate_embedding(text: str) -> list:
+def generate_embedding(text: str, model: str = DEFAULT_MODEL) -> list:
     """
     Generates an embedding vector for the given text using Ollama.
 
     Args:
         text (str): The text to embed.
+        model (str): The Ollama embedding model to use.
 
     Returns:
         list: A list of floating-point numbers representing the embedding.
 
     Notes:
-        - Uses the 'nomic-embed-text' model (small, fast, ideal for memory).
-        - You can swap this for another embedding model later.
+        - Defaults to 'nomic-embed-text' (small, fast, ideal for memory).
+        - Vectors from different models are not compatible. To switch
+          models, re-index with app/memory/reindex.py rather than
+          changing the default.
     """
 
     url = "http://localhost:11434/api/embeddings"
     payload = {
-        "model": "nomic-embed-text",
-        "input": text
+        "model": model,
+        "prompt": text
     }
 
     try:
-        response = requests.post(url, json=payload)
+        response = requests.post(url, json=payload, timeout=10)
         response.raise_for_status()
 
         data = response.json()
@@ -8,6 +8,8 @@ import os
 import json
 from datetime import datetime
 
+from filelock import FileLock
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_PATH = os.path.join(BASE_DIR, "memory_log.jsonl")
 
@@ -25,6 +27,8 @@ def log_memory(role: str, text: str):
         "timestamp": datetime.utcnow().isoformat() + "Z"
     }
 
-    with open(LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    # Workers append concurrently; keep each line whole
+    with FileLock(LOG_PATH + ".lock"):
+        with open(LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
 
@@ -6,8 +6,9 @@ memories using ChromaDB. Sonny uses this to remember facts,
 preferences, and long-term context.
 """
 
-from app.memory.chroma_client import get_memory_collection
+from app.memory.chroma_client import get_active_index, get_collection, get_memory_collection
 from app.memory.embedder import embed_text
+from app.memory.embedding_queue import enqueue, index_memories, pending_documents
 import uuid
 
 
@@ -18,21 +19,31 @@ import uuid
 def store_memory(text: str, metadata: dict = None) -> str:
     """
     Stores a memory in ChromaDB.
-    """
 
-    collection = get_memory_collection()
+    If no embedding can be generated, or the embedder recently failed,
+    the memory is queued text-only and indexed later by the embedding
+    queue worker.
+    """
 
-    embedding = embed_text(text)
+    # Embed and write against the same index; index_memories follows a swap
+    index = get_active_index()
+    embedding = embed_text(text, index["model"])
     memory_id = str(uuid.uuid4())
 
     safe_metadata = metadata or {"source": "sonny"}
 
-    collection.add(
+    if not embedding:
+        enqueue(memory_id, text, safe_metadata)
+        return memory_id
+
+    if not index_memories(
+        index,
         ids=[memory_id],
         documents=[text],
         embeddings=[embedding],
         metadatas=[safe_metadata]
-    )
+    ):
+        enqueue(memory_id, text, safe_metadata)
 
     return memory_id
 
@@ -101,22 +112,24 @@ def list_all_memories():
 #---------------------------------------------------------
 
 def hybrid_memory_search(query: str, n_results: int = 3):
-    collection = get_memory_collection()
+    index = get_active_index()
+    collection = get_collection(index)
 
-    # --- Semantic search ---
+    # --- Semantic search (skipped while the embedder is down or cooling off) ---
     semantic = []
-    try:
-        semantic_results = collection.query(
-            query_embeddings=[embed_text(query)],
-            n_results=n_results
-        )
-        semantic = semantic_results.get("documents", [[]])[0]
-    except Exception:
-        semantic = []
-
-    # --- Keyword search ---
-    all_docs = collection.get().get("documents", [])
-    flat_docs = [d for sub in all_docs for d in sub]  # flatten
+    query_embedding = embed_text(query, index["model"])
+    if query_embedding:
+        try:
+            semantic_results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=n_results
+            )
+            semantic = semantic_results.get("documents", [[]])[0]
+        except Exception:
+            semantic = []
+
+    # --- Keyword search (includes memories still waiting for an embedding) ---
+    flat_docs = (collection.get().get("documents") or []) + pending_documents()
 
     keywords = [
         "name", "prefer", "like", "love", "from", "live",
@@ -0,0 +1,232 @@
+"""
+reindex.py — Online migration to a new embedding model
+
+Builds a collection for the new model in batches while queries keep
+using the live one, then swaps the registry pointer in one write.
+The old collection is left in place; delete it once the new one checks out.
+
+Progress lives in the registry file, so any uvicorn worker can report it.
+
+Run from the API (POST /memory/reindex) or from a shell. The shell
+form opens its own Chroma client, so it needs the shared service
+(SONNY_CHROMA_HOST); in embedded mode use the API instead:
+
+    SONNY_CHROMA_HOST=localhost python -m app.memory.reindex mxbai-embed-large
+"""
+
+import sys
+import threading
+import time
+
+from app.memory.chroma_client import (
+    CHROMA_HOST,
+    collection_name,
+    get_collection,
+    load_registry,
+    registry_lock,
+    save_registry,
+)
+from app.memory.embedder import embed_text
+
+BATCH_SIZE = 32
+EMBED_RETRIES = 3
+RETRY_BACKOFF = 2       # seconds, doubled per retry
+STALE_AFTER = 300       # a job silent for this long is treated as dead;
+                        # heartbeats come at least once per embed attempt
+
+
+# ---------------------------------------------------------
+# Progress bookkeeping
+# ---------------------------------------------------------
+
+def reindex_status() -> dict:
+    """Current (or last) migration, or None if none has run."""
+    return load_registry().get("migration")
+
+
+def _update_migration(**fields):
+    with registry_lock():
+        registry = load_registry()
+        registry.setdefault("migration", {}).update(fields, updated_at=time.time())
+        save_registry(registry)
+
+
+def _is_running(migration: dict) -> bool:
+    return (
+        migration is not None
+        and migration.get("status") in ("running", "swapped")
+        and time.time() - migration.get("updated_at", 0) < STALE_AFTER
+    )
+
+
+# ---------------------------------------------------------
+# Re-embedding
+# ---------------------------------------------------------
+
+def _heartbeat():
+    _update_migration()
+
+
+def _embed_with_retry(text: str, model: str) -> list:
+    for attempt in range(EMBED_RETRIES):
+        embedding = embed_text(text, model, force=True)
+        _heartbeat()
+        if embedding:
+            return embedding
+        time.sleep(RETRY_BACKOFF * 2 ** attempt)
+    raise RuntimeError(f"Embedding model '{model}' kept failing")
+
+
+def _copy_missing(source, target, model: str, batch_size: int, progress) -> int:
+    """Embed every memory in source that target doesn't have yet."""
+    source_ids = source.get(include=[])["ids"]
+    target_ids = set(target.get(include=[])["ids"])
+    todo = [i for i in source_ids if i not in target_ids]
+
+    copied = 0
+    for start in range(0, len(todo), batch_size):
+        rows = source.get(ids=todo[start:start + batch_size], include=["documents", "metadatas"])
+        target.upsert(
+            ids=rows["ids"],
+            documents=rows["documents"],
+            embeddings=[_embed_with_retry(d, model) for d in rows["documents"]],
+            metadatas=rows["metadatas"],
+        )
+        copied += len(rows["ids"])
+        progress(len(source_ids) - len(todo) + copied, len(source_ids), copied)
+
+    return copied
+
+
+def begin_reindex(model: str) -> tuple:
+    """
+    Validate the request and record a new migration in the registry.
+
+    Returns:
+        tuple: (source_index, target_index)
+
+    Raises:
+        RuntimeError: If a migration is already running, the model is
+            already live, or the model can't produce embeddings.
+    """
+    with registry_lock():
+        registry = load_registry()
+        if _is_running(registry.get("migration")):
+            raise RuntimeError("A re-index is already running")
+
+        source_index = registry["active"]
+        if source_index["model"] == model:
+            raise RuntimeError(f"'{model}' is already the active embedding model")
+
+        probe = embed_text("dimension probe", model, force=True)
+        if not probe:
+            raise RuntimeError(f"Embedding model '{model}' is unavailable")
+
+        target_index = {
+            "name": collection_name(model, len(probe)),
+            "model": model,
+            "dim": len(probe),
+        }
+        registry["migration"] = {
+            "status": "running",
+            "source": source_index,
+            "target": target_index,
+            "done": 0,
+            "total": 0,
+            "per_second": 0.0,
+            "started_at": time.time(),
+            "updated_at": time.time(),
+        }
+        save_registry(registry)
+
+    return source_index, target_index
+
+
+def run_reindex(source_index: dict, target_index: dict, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Fill the target collection from the source, then make it live.
+
+    Returns:
+        dict: The new active index.
+    """
+    model = target_index["model"]
+    source = get_collection(source_index)
+    target = get_collection(target_index)
+    started = time.time()
+    embedded = 0
+
+    def progress(done, total, copied):
+        _update_migration(
+            done=done,
+            total=total,
+            per_second=round((embedded + copied) / max(time.time() - started, 1e-6), 2),
+        )
+
+    try:
+        # Keep going until a pass finds nothing new; writes continue meanwhile
+        while True:
+            copied = _copy_missing(source, target, model, batch_size, progress)
+            embedded += copied
+            if not copied:
+                break
+
+        with registry_lock():
+            registry = load_registry()
+            registry["active"] = target_index
+            registry["migration"].update(status="swapped", updated_at=time.time())
+            save_registry(registry)
+
+        # Catch writes that landed on the old collection around the swap.
+        # Writers that read the old index also re-check it after writing
+        # (see embedding_queue.index_memories), so once a pass is empty
+        # nothing else can be left behind.
+        while _copy_missing(source, target, model, batch_size, progress):
+            pass
+        _update_migration(status="complete", finished_at=time.time())
+
+    except Exception as e:
+        _update_migration(status="failed", error=str(e))
+        raise
+
+    return target_index
+
+
+def reindex(model: str, batch_size: int = BATCH_SIZE) -> dict:
+    """Re-embed the live collection with model and swap to it."""
+    source_index, target_index = begin_reindex(model)
+    return run_reindex(source_index, target_index, batch_size)
+
+
+def start_reindex(model: str) -> dict:
+    """
+    Validate and record the migration, then run it on a background thread.
+
+    Returns:
+        dict: The migration status as first recorded.
+    """
+    source_index, target_index = begin_reindex(model)
+
+    def run():
+        try:
+            run_reindex(source_index, target_index)
+        except Exception as e:
+            print(f"[Reindex Error] {e}")
+
+    threading.Thread(target=run, name="reindex", daemon=True).start()
+    return reindex_status()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python -m app.memory.reindex <embedding-model>")
+        sys.exit(1)
+
+    if not CHROMA_HOST:
+        print(
+            "The re-index CLI needs the shared Chroma service (SONNY_CHROMA_HOST); "
+            "with the embedded store, use POST /memory/reindex on the running server."
+        )
+        sys.exit(1)
+
+    active = reindex(sys.argv[1])
+    print(f"Active index is now {active['name']}")
@@ -0,0 +1,47 @@
+#!/usr/bin/env bash
+# Start the shared Chroma service and the API across several workers.
+# Stopping this script (Ctrl-C, SIGTERM or stop.sh) stops both.
+set -e
+
+cd "$(dirname "$0")/.."
+
+CHROMA_PATH="${CHROMA_PATH:-/home/sonny/sonny-system/data/chroma}"
+export SONNY_CHROMA_HOST="${SONNY_CHROMA_HOST:-localhost}"
+export SONNY_CHROMA_PORT="${SONNY_CHROMA_PORT:-8001}"
+WORKERS="${WORKERS:-$(nproc)}"
+CHROMA_WAIT="${CHROMA_WAIT:-30}"
+
+CHROMA_PID=""
+UVICORN_PID=""
+
+cleanup() {
+    # A process may already be gone (e.g. uvicorn crashed); keep cleaning up
+    set +e
+    [ -n "$UVICORN_PID" ] && kill "$UVICORN_PID" 2>/dev/null
+    [ -n "$CHROMA_PID" ] && kill "$CHROMA_PID" 2>/dev/null
+    wait 2>/dev/null
+    rm -f data/sonny.pid
+}
+trap cleanup EXIT
+trap 'exit 130' INT
+trap 'exit 143' TERM
+
+mkdir -p data/logs
+echo $$ > data/sonny.pid
+
+chroma run --path "$CHROMA_PATH" --host "$SONNY_CHROMA_HOST" --port "$SONNY_CHROMA_PORT" \
+    > data/logs/chroma.log 2>&1 &
+CHROMA_PID=$!
+
+# Don't start workers until Chroma answers its heartbeat
+HEARTBEAT="http://$SONNY_CHROMA_HOST:$SONNY_CHROMA_PORT/api/v1/heartbeat"
+for _ in $(seq "$CHROMA_WAIT"); do
+    curl -fs "$HEARTBEAT" > /dev/null && break
+    kill -0 "$CHROMA_PID" 2>/dev/null || { echo "Chroma exited, see data/logs/chroma.log" >&2; exit 1; }
+    sleep 1
+done
+curl -fs "$HEARTBEAT" > /dev/null || { echo "Chroma not ready after ${CHROMA_WAIT}s" >&2; exit 1; }
+
+uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers "$WORKERS" &
+UVICORN_PID=$!
+wait "$UVICORN_PID"
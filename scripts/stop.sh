@@ -0,0 +1,7 @@
+#!/usr/bin/env bash
+# Stop Sonny started by start.sh; its exit trap stops uvicorn and Chroma.
+cd "$(dirname "$0")/.."
+
+if [ -f data/sonny.pid ]; then
+    kill "$(cat data/sonny.pid)" 2>/dev/null || true
+fi
@@ -7,8 +7,11 @@ This is the file that Sonny will read from and write to when storing and retriev
 
 import json
 import os
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
+from filelock import FileLock
+
 BASE_DIR = "/home/sonny/sonny-system/data/memory"
 
 FILES = {
@@ -42,9 +45,21 @@ def _load(path, default):
 
 
 def _save(path, data):
-    """Write JSON safely."""
-    with open(path, "w") as f:
+    """Write JSON safely (temp file + rename, so readers never see half a file)."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
         json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def _locked(path):
+    """
+    Hold a cross-process lock on a memory file for a load-modify-save cycle.
+    Needed when several uvicorn workers and the reminder scheduler share it.
+    """
+    with FileLock(f"{path}.lock"):
+        yield path
 
 
 def _path(name):
@@ -62,9 +77,10 @@ def get_resident_name(resident_id):
 
 
 def set_resident(resident_id, name):
-    data = _load(_path("residents"), {})
-    data[resident_id] = name
-    _save(_path("residents"), data)
+    with _locked(_path("residents")) as path:
+        data = _load(path, {})
+        data[resident_id] = name
+        _save(path, data)
 
 
 # -----------------------------
@@ -75,8 +91,6 @@ def add_reminder(title, event_time, remind_before_minutes=60):
     """
     event_time: ISO string "2026-02-08T14:00:00"
     """
-    data = _load(_path("reminders"), {"reminders": []})
-
     event_dt = datetime.fromisoformat(event_time)
     remind_at = event_dt - timedelta(minutes=remind_before_minutes)
 
@@ -88,8 +102,10 @@ def add_reminder(title, event_time, remind_before_minutes=60):
         "delivered": False
     }
 
-    data["reminders"].append(reminder)
-    _save(_path("reminders"), data)
+    with _locked(_path("reminders")) as path:
+        data = _load(path, {"reminders": []})
+        data["reminders"].append(reminder)
+        _save(path, data)
 
     return reminder
 
@@ -109,11 +125,12 @@ def get_due_reminders():
 
 
 def mark_reminder_delivered(reminder_id):
-    data = _load(_path("reminders"), {"reminders": []})
-    for r in data["reminders"]:
-        if r["id"] == reminder_id:
-            r["delivered"] = True
-    _save(_path("reminders"), data)
+    with _locked(_path("reminders")) as path:
+        data = _load(path, {"reminders": []})
+        for r in data["reminders"]:
+            if r["id"] == reminder_id:
+                r["delivered"] = True
+        _save(path, data)
 
 
 # -----------------------------
@@ -131,7 +148,8 @@ def update_calendar(events):
         "person": "resident_3"
     }
     """
-    _save(_path("calendar"), {"events": events})
+    with _locked(_path("calendar")) as path:
+        _save(path, {"events": events})
 
 
 def get_events_for_resident(resident_id):
@@ -144,9 +162,10 @@ def get_events_for_resident(resident_id):
 # -----------------------------
 
 def set_preference(key, value):
-    data = _load(_path("preferences"), {})
-    data[key] = value
-    _save(_path("preferences"), data)
+    with _locked(_path("preferences")) as path:
+        data = _load(path, {})
+        data[key] = value
+        _save(path, data)
 
 
 def get_preference(key, default=None):